@@ -1,20 +1,49 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import random
+import io
 import json
-import re
 import logging
 from typing import Dict, Any, Optional
 from urllib.parse import urljoin, urlencode
 from config import Config
+from circuit import CircuitBreaker
+from http_common import ApiClientMixin, json_loads, BACKOFF_CAP, JSON_HINTS
 
-class TikTokAPIClient:
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# 页面水合数据所在script标签及token所在的JSON路径
+_SIGI_SCRIPT_MARKER = 'id="__UNIVERSAL_DATA_FOR_REHYDRATION__"'
+_TOKEN_PREFIX = '__DEFAULT_SCOPE__.webapp.app-context'
+
+class TikTokAPIClient(ApiClientMixin):
     """TikTok API客户端类"""
     
     def __init__(self, session: Optional[requests.Session] = None):
         self.session = session or requests.Session()
         self.session.headers.update(Config.DEFAULT_HEADERS)
+        self.session.headers['connection'] = 'keep-alive'
+        self._mount_pooled_adapter()
+        self._base_headers = dict(self.session.headers)
         self.logger = logging.getLogger(__name__)
         self._session_initialized = False
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        
+    def _mount_pooled_adapter(self):
+        """挂载连接池适配器，复用keep-alive连接避免重复TCP/TLS握手"""
+        adapter = HTTPAdapter(
+            pool_connections=Config.HTTP_CONFIG['pool_connections'],
+            pool_maxsize=Config.HTTP_CONFIG['pool_maxsize'],
+            pool_block=False,
+            max_retries=0
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def initialize_session(self) -> bool:
         """
@@ -44,7 +73,7 @@ class TikTokAPIClient:
             self._extract_tokens_from_html(home_response.text)
             
             # 3. 访问搜索页面建立搜索上下文
-            search_headers = self.session.headers.copy()
+            search_headers = dict(self._base_headers)
             search_headers['referer'] = Config.SESSION_INIT_CONFIG['home_page_url']
             
             search_response = self.session.get(
@@ -63,18 +92,37 @@ class TikTokAPIClient:
             return False
     
     def _extract_tokens_from_html(self, html_content: str):
-        """从HTML中提取token信息"""
+        """从HTML中提取token信息，流式解析水合数据，找到所需字段后立即停止"""
         try:
-            # 尝试提取SIGI_STATE中的数据
-            sigi_pattern = r'<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">(.*?)</script>'
-            match = re.search(sigi_pattern, html_content)
-            if match:
-                try:
-                    data = json.loads(match.group(1))
-                    # 这里可以根据实际返回的数据结构提取需要的token
-                    self.logger.debug("成功提取页面数据")
-                except json.JSONDecodeError:
-                    pass
+            # 定位水合数据script标签的内容
+            marker = html_content.find(_SIGI_SCRIPT_MARKER)
+            if marker == -1:
+                return
+            start = html_content.find('>', marker) + 1
+            end = html_content.find('</script>', start)
+            if start == 0 or end == -1:
+                return
+            payload = html_content[start:end]
+            
+            wanted = set(Config.SESSION_INIT_CONFIG['required_cookies'])
+            tokens = {}
+            try:
+                if IJSON_AVAILABLE:
+                    for key, value in ijson.kvitems(io.BytesIO(payload.encode('utf-8')), _TOKEN_PREFIX):
+                        if key in wanted and isinstance(value, str):
+                            tokens[key] = value
+                            if len(tokens) == len(wanted):
+                                break
+                else:
+                    data = json_loads(payload)
+                    app_context = data.get('__DEFAULT_SCOPE__', {}).get('webapp.app-context', {})
+                    tokens = {k: v for k, v in app_context.items() if k in wanted and isinstance(v, str)}
+            except ValueError:
+                return
+            
+            for name, value in tokens.items():
+                self.session.cookies.set(name, value, domain='.tiktok.com')
+            self.logger.debug(f"成功提取页面数据，token: {list(tokens.keys())}")
         except Exception as e:
             self.logger.debug(f"提取token时出错: {str(e)}")
 
@@ -96,7 +144,7 @@ class TikTokAPIClient:
                     self.logger.error("会话初始化失败，无法继续请求")
                     return None
             
-            api_config = Config.API_CONFIGS.get(api_name)
+            api_config = Config.get_api_config(api_name)
             if not api_config:
                 raise ValueError(f"未找到API配置: {api_name}")
             
@@ -110,13 +158,24 @@ class TikTokAPIClient:
             keyword = dynamic_params.get('keyword', '') if dynamic_params else ''
             dynamic_headers = Config.get_dynamic_headers(keyword)
             
+            # 熔断器打开时快速失败，避免在已知故障的接口上耗费超时
+            breaker = self._get_breaker(api_name)
+            if not breaker.allow():
+                self.logger.warning(f"接口已熔断，跳过请求: {api_name}")
+                return None
+            
             # 发起请求
-            response = self._send_request(
-                method=api_config['method'],
-                url=url,
-                params=params,
-                headers=dynamic_headers
-            )
+            try:
+                response = self._send_request(
+                    method=api_config['method'],
+                    url=url,
+                    params=params,
+                    headers=dynamic_headers
+                )
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
             
             return response
             
@@ -124,29 +183,13 @@ class TikTokAPIClient:
             self.logger.error(f"API请求失败 {api_name}: {str(e)}")
             return None
     
-    def _build_params(self, api_config: Dict, dynamic_params: Dict[str, Any]) -> Dict:
-        """构建请求参数"""
-        params = api_config['params_template'].copy()
-        
-        # 替换动态参数
-        for key, value in params.items():
-            if isinstance(value, str) and '{' in value and '}' in value:
-                try:
-                    params[key] = value.format(**dynamic_params)
-                except KeyError as e:
-                    raise ValueError(f"缺少必需的动态参数: {e}")
-        
-        return params
-    
     def _send_request(self, method: str, url: str, params: Dict = None, headers: Dict = None) -> Dict:
         """发送HTTP请求"""
         max_retries = 3
         retry_delay = 1
         
         # 合并请求头
-        request_headers = self.session.headers.copy()
-        if headers:
-            request_headers.update(headers)
+        request_headers = {**self._base_headers, **headers} if headers else self._base_headers
         
         for attempt in range(max_retries):
             try:
@@ -167,39 +210,47 @@ class TikTokAPIClient:
                 else:
                     raise ValueError(f"不支持的HTTP方法: {method}")
                 
-                response.raise_for_status()
+                status = response.status_code
+                if status >= 400:
+                    response.raise_for_status()
                 
                 # 记录响应信息用于调试
-                self.logger.debug(f"响应状态码: {response.status_code}")
-                self.logger.debug(f"响应头: {dict(response.headers)}")
+                self.logger.debug("响应状态码: %s", status)
+                self.logger.debug("响应头: %s", response.headers)
                 
-                # 检查响应内容类型
+                # 检查响应内容类型，响应体只读取一次bytes，不触发整段解码
                 content_type = response.headers.get('content-type', '')
-                if 'application/json' not in content_type:
+                body = response.content
+                if not content_type.startswith(JSON_HINTS):
                     self.logger.warning(f"响应不是JSON格式，内容类型: {content_type}")
-                    self.logger.debug(f"响应内容前200字符: {response.text[:200]}")
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("响应内容前200字符: %s", body[:200].decode('utf-8', 'replace'))
                     
                     # 如果是HTML响应，可能是被重定向到登录页面
-                    if 'text/html' in content_type:
+                    if content_type.startswith('text/html'):
                         raise ValueError("收到HTML响应，可能需要重新初始化会话")
                 
-                return response.json()
+                return json_loads(body)
                 
             except json.JSONDecodeError as e:
                 self.logger.warning(f"JSON解析失败 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
-                self.logger.debug(f"响应内容: {response.text[:500]}")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("响应内容: %s", response.content[:500].decode('utf-8', 'replace'))
                 
                 if attempt < max_retries - 1:
                     # 重新初始化会话
                     self._session_initialized = False
-                    time.sleep(retry_delay * (2 ** attempt))
+                    # 全抖动指数退避，避免并发重试同时触发
+                    sleep_for = random.uniform(0, min(BACKOFF_CAP, retry_delay * (2 ** attempt)))
+                    time.sleep(sleep_for)
                 else:
                     raise
                     
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
                 if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (2 ** attempt))
+                    sleep_for = random.uniform(0, min(BACKOFF_CAP, retry_delay * (2 ** attempt)))
+                    time.sleep(sleep_for)
                 else:
                     raise
     
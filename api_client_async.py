@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Dict, Any, List, Optional
+from urllib.parse import urljoin
+from config import Config
+from circuit import CircuitBreaker
+from http_common import ApiClientMixin, json_loads, BACKOFF_CAP, JSON_HINTS
+
+try:
+    import aiohttp
+    from yarl import URL
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+class AsyncTikTokAPIClient(ApiClientMixin):
+    """基于aiohttp的异步TikTok API客户端类，多个请求可在同一线程内并发执行"""
+
+    def __init__(self):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp未安装，无法使用异步客户端")
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.logger = logging.getLogger(__name__)
+        self._session_initialized = False
+        # 是否已导入外部会话的实时Cookie（导入后重新初始化时不再写入配置中的默认Cookie）
+        self._cookies_imported = False
+        self._init_lock = asyncio.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # 进行中的请求（用于合并重复请求）及并发上限
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(Config.HTTP_CONFIG['max_concurrent_requests'])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _create_session(self) -> 'aiohttp.ClientSession':
+        """创建带连接池的aiohttp会话（必须在事件循环中调用）"""
+        http_config = Config.HTTP_CONFIG
+        connector = aiohttp.TCPConnector(
+            limit=http_config['connector_limit'],
+            limit_per_host=http_config['connector_limit_per_host'],
+            ttl_dns_cache=http_config['dns_cache_ttl']
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=http_config['timeout']),
+            headers=Config.DEFAULT_HEADERS
+        )
+
+    async def initialize_session(self) -> bool:
+        """
+        初始化会话，访问主页获取必要的Cookie
+
+        Returns:
+            初始化是否成功
+        """
+        try:
+            self.logger.info("正在初始化TikTok异步会话...")
+
+            if self.session is None:
+                self.session = self._create_session()
+
+            # 设置初始Cookie（已导入实时Cookie时保留导入的值）
+            if not self._cookies_imported:
+                self.session.cookie_jar.update_cookies(
+                    Config.DEFAULT_COOKIES,
+                    response_url=URL(Config.BASE_URL)
+                )
+
+            # 1. 访问主页
+            async with self.session.get(Config.SESSION_INIT_CONFIG['home_page_url']) as home_response:
+                home_response.raise_for_status()
+                await home_response.read()
+
+            # 等待一下模拟用户行为
+            await asyncio.sleep(Config.SESSION_INIT_CONFIG['delay_between_requests'])
+
+            # 2. 访问搜索页面建立搜索上下文
+            search_headers = {'referer': Config.SESSION_INIT_CONFIG['home_page_url']}
+            async with self.session.get(
+                Config.SESSION_INIT_CONFIG['search_page_url'],
+                headers=search_headers
+            ) as search_response:
+                search_response.raise_for_status()
+                await search_response.read()
+
+            self._session_initialized = True
+            self.logger.info("TikTok异步会话初始化成功")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"异步会话初始化失败: {str(e)}")
+            return False
+
+    def import_cookies(self, cookies: Dict[str, str]):
+        """
+        导入已初始化会话（如Selenium浏览器会话）中的Cookie，导入后不再访问主页初始化（必须在事件循环中调用）
+
+        Args:
+            cookies: Cookie名称到值的字典
+        """
+        if self.session is None:
+            self.session = self._create_session()
+        self.session.cookie_jar.update_cookies(cookies, response_url=URL(Config.BASE_URL))
+        self._cookies_imported = True
+        self._session_initialized = True
+
+    async def _ensure_session(self) -> bool:
+        """确保会话已初始化，并发调用时只初始化一次"""
+        if self._session_initialized:
+            return True
+        async with self._init_lock:
+            if self._session_initialized:
+                return True
+            return await self.initialize_session()
+
+    async def make_request(self, api_name: str, dynamic_params: Dict[str, Any] = None) -> Optional[Dict]:
+        """
+        发起API请求，并发中的相同请求只会发送一次
+
+        Args:
+            api_name: API配置名称
+            dynamic_params: 动态参数字典
+
+        Returns:
+            API响应数据或None
+        """
+        key = (api_name, frozenset((dynamic_params or {}).items()))
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield避免某个等待方被取消时连带取消共享的请求
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._make_request(api_name, dynamic_params)
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    async def _make_request(self, api_name: str, dynamic_params: Dict[str, Any] = None) -> Optional[Dict]:
+        """发起API请求（不合并重复请求）"""
+        try:
+            # 确保会话已初始化
+            if not await self._ensure_session():
+                self.logger.error("会话初始化失败，无法继续请求")
+                return None
+
+            api_config = Config.get_api_config(api_name)
+            if not api_config:
+                raise ValueError(f"未找到API配置: {api_name}")
+
+            # 构建请求参数
+            params = self._build_params(api_config, dynamic_params or {})
+
+            # 构建完整URL
+            url = urljoin(Config.BASE_URL, api_config['url'])
+
+            # 设置动态请求头
+            keyword = dynamic_params.get('keyword', '') if dynamic_params else ''
+            dynamic_headers = Config.get_dynamic_headers(keyword)
+
+            # 熔断器打开时快速失败，避免在已知故障的接口上耗费超时
+            breaker = self._get_breaker(api_name)
+            if not breaker.allow():
+                self.logger.warning(f"接口已熔断，跳过请求: {api_name}")
+                return None
+
+            # 发起请求
+            try:
+                async with self._semaphore:
+                    response = await self._send_request(
+                        method=api_config['method'],
+                        url=url,
+                        params=params,
+                        headers=dynamic_headers
+                    )
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+
+            return response
+
+        except Exception as e:
+            self.logger.error(f"API请求失败 {api_name}: {str(e)}")
+            return None
+
+    async def gather_keywords(self, keywords: List[str]) -> List[Optional[Dict]]:
+        """
+        并发请求多个关键词的搜索预览接口
+
+        Args:
+            keywords: 关键词列表
+
+        Returns:
+            与关键词顺序一致的响应数据列表
+        """
+        # 并发上限由make_request内部的信号量控制
+        return await asyncio.gather(*[
+            self.make_request('search_general_preview', {'keyword': k}) for k in keywords
+        ])
+
+    async def make_requests(self, api_name: str, keyword_list: List[str]) -> List[Optional[Dict]]:
+        """
+        批量请求同一API的多个关键词：配置、参数和请求头一次性准备好后并发发送
+
+        Args:
+            api_name: API配置名称
+            keyword_list: 关键词列表
+
+        Returns:
+            与关键词顺序一致的响应数据列表，失败的位置为None
+        """
+        failed = [None] * len(keyword_list)
+
+        if not await self._ensure_session():
+            self.logger.error("会话初始化失败，无法继续请求")
+            return failed
+
+        api_config = Config.get_api_config(api_name)
+        if not api_config:
+            self.logger.error(f"API请求失败 {api_name}: 未找到API配置: {api_name}")
+            return failed
+
+        breaker = self._get_breaker(api_name)
+        if not breaker.allow():
+            self.logger.warning(f"接口已熔断，跳过请求: {api_name}")
+            return failed
+
+        method = api_config['method']
+        url = urljoin(Config.BASE_URL, api_config['url'])
+        try:
+            prepared = [
+                (self._build_params(api_config, {'keyword': keyword}), Config.get_dynamic_headers(keyword))
+                for keyword in keyword_list
+            ]
+        except ValueError as e:
+            self.logger.error(f"API请求失败 {api_name}: {str(e)}")
+            return failed
+
+        async def send(params: Dict, headers: Dict) -> Dict:
+            async with self._semaphore:
+                return await self._send_request(method=method, url=url, params=params, headers=headers)
+
+        results = await asyncio.gather(*[send(p, h) for p, h in prepared], return_exceptions=True)
+
+        responses = []
+        for keyword, result in zip(keyword_list, results):
+            if isinstance(result, BaseException):
+                breaker.record_failure()
+                self.logger.error(f"API请求失败 {api_name} [{keyword}]: {str(result)}")
+                responses.append(None)
+            else:
+                breaker.record_success()
+                responses.append(result)
+        return responses
+
+    async def _send_request(self, method: str, url: str, params: Dict = None, headers: Dict = None) -> Dict:
+        """发送HTTP请求"""
+        max_retries = 3
+        retry_delay = 1
+
+        for attempt in range(max_retries):
+            try:
+                if method.upper() == 'GET':
+                    request = self.session.get(url, params=params, headers=headers)
+                elif method.upper() == 'POST':
+                    request = self.session.post(url, data=params, headers=headers)
+                else:
+                    raise ValueError(f"不支持的HTTP方法: {method}")
+
+                async with request as response:
+                    status = response.status
+                    if status >= 400:
+                        response.raise_for_status()
+
+                    self.logger.debug("响应状态码: %s", status)
+
+                    # 检查响应内容类型
+                    content_type = response.headers.get('content-type', '')
+                    if not content_type.startswith(JSON_HINTS):
+                        self.logger.warning(f"响应不是JSON格式，内容类型: {content_type}")
+
+                        # 如果是HTML响应，可能是被重定向到登录页面
+                        if content_type.startswith('text/html'):
+                            raise ValueError("收到HTML响应，可能需要重新初始化会话")
+
+                    return json_loads(await response.read())
+
+            except json.JSONDecodeError as e:
+                self.logger.warning(f"JSON解析失败 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
+
+                if attempt < max_retries - 1:
+                    # 重新初始化会话
+                    self._session_initialized = False
+                    # 全抖动指数退避，避免并发重试同时触发
+                    sleep_for = random.uniform(0, min(BACKOFF_CAP, retry_delay * (2 ** attempt)))
+                    await asyncio.sleep(sleep_for)
+                else:
+                    raise
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
+                if attempt < max_retries - 1:
+                    sleep_for = random.uniform(0, min(BACKOFF_CAP, retry_delay * (2 ** attempt)))
+                    await asyncio.sleep(sleep_for)
+                else:
+                    raise
+
+    async def close(self):
+        """关闭会话"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def fetch_keywords(keywords: List[str]) -> List[Optional[Dict]]:
+    """
+    同步包装：在新的事件循环中并发请求多个关键词，供非异步调用方使用
+
+    Args:
+        keywords: 关键词列表
+
+    Returns:
+        与关键词顺序一致的响应数据列表
+    """
+    async def _run():
+        async with AsyncTikTokAPIClient() as client:
+            return await client.gather_keywords(keywords)
+
+    return asyncio.run(_run())
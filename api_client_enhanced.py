@@ -1,13 +1,47 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import random
+import io
 import json
 import re
 import logging
 import os
+import itertools
 from datetime import datetime
 from typing import Dict, Any, Optional
 from urllib.parse import urljoin, urlencode, quote
 from config import Config
+from circuit import CircuitBreaker
+from http_common import ApiClientMixin, json_loads, BACKOFF_CAP, JSON_HINTS
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import httpx
+    import h2  # noqa: F401  httpx的HTTP/2支持依赖h2
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# 两种传输层的网络异常
+_TRANSPORT_ERRORS = (
+    (requests.exceptions.RequestException, httpx.HTTPError) if HTTPX_AVAILABLE
+    else (requests.exceptions.RequestException,)
+)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# 响应体去除前导空白后以'{'开头
+_JSON_START_RE = re.compile(rb'\s*\{')
 
 try:
     from selenium import webdriver
@@ -20,15 +54,30 @@ try:
 except ImportError:
     SELENIUM_AVAILABLE = False
 
-class TikTokAPIClientEnhanced:
+def _is_tiktok_host(host: str) -> bool:
+    """判断域名是否属于tiktok.com（不包括tiktokv.com等其他域名）"""
+    host = host.lstrip('.').lower()
+    return host == 'tiktok.com' or host.endswith('.tiktok.com')
+
+
+class TikTokAPIClientEnhanced(ApiClientMixin):
     """增强版TikTok API客户端类，支持Selenium备用方案"""
     
     def __init__(self, session: Optional[requests.Session] = None, use_selenium: bool = None):
-        self.session = session or requests.Session()
+        self.session = session or self._create_session()
         self.session.headers.update(Config.DEFAULT_HEADERS)
+        if isinstance(self.session, requests.Session):
+            # HTTP/2禁止connection头，仅requests(HTTP/1.1)需要显式keep-alive
+            self.session.headers['connection'] = 'keep-alive'
+            self._mount_pooled_adapter()
+        self._base_headers = dict(self.session.headers)
         self.logger = logging.getLogger(__name__)
         self._session_initialized = False
         self.driver = None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._dbg_seq = itertools.count()
+        # 调试目录当前占用字节数，首次保存时扫描一次，之后按写入累加
+        self._dbg_dir_bytes: Optional[int] = None
         
         # 确定是否使用Selenium
         self.use_selenium = use_selenium if use_selenium is not None else Config.SELENIUM_CONFIG['use_selenium']
@@ -40,10 +89,46 @@ class TikTokAPIClientEnhanced:
         if Config.DEBUG_CONFIG['save_response_content']:
             Config.ensure_debug_dir()
     
+    def _create_session(self):
+        """创建HTTP会话：可用时使用httpx HTTP/2（单连接多路复用），否则使用requests"""
+        if HTTPX_AVAILABLE and Config.HTTP_CONFIG['http2']:
+            return httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_CONFIG['max_connections'],
+                    max_keepalive_connections=Config.HTTP_CONFIG['max_keepalive_connections']
+                ),
+                timeout=Config.HTTP_CONFIG['timeout'],
+                follow_redirects=True
+            )
+        return requests.Session()
+    
+    def _mount_pooled_adapter(self):
+        """挂载连接池适配器，复用keep-alive连接避免重复TCP/TLS握手"""
+        adapter = HTTPAdapter(
+            pool_connections=Config.HTTP_CONFIG['pool_connections'],
+            pool_maxsize=Config.HTTP_CONFIG['pool_maxsize'],
+            pool_block=False,
+            max_retries=0
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
     def _init_selenium_driver(self) -> bool:
-        """初始化Selenium WebDriver"""
+        """初始化Selenium WebDriver（复用已启动且仍可用的浏览器，浏览器崩溃或被关闭后重新启动）"""
+        if self.driver is not None:
+            if self._driver_alive():
+                return True
+            self.logger.warning("⚠️  浏览器已不可用，重新启动WebDriver")
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        
         try:
             chrome_options = Options()
+            chrome_options.page_load_strategy = Config.SELENIUM_CONFIG['page_load_strategy']
             
             if Config.SELENIUM_CONFIG['headless']:
                 chrome_options.add_argument('--headless')
@@ -87,9 +172,12 @@ class TikTokAPIClientEnhanced:
             # 执行脚本隐藏webdriver特征
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
-            # 尝试启用网络域（如果支持）
+            # 尝试启用网络域并屏蔽无用资源（如果支持）
             try:
                 self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {
+                    'urls': Config.SELENIUM_CONFIG['blocked_urls']
+                })
                 self.logger.debug("🌐 网络域启用成功")
             except Exception as e:
                 self.logger.debug(f"⚠️  网络域启用失败: {str(e)}")
@@ -101,6 +189,15 @@ class TikTokAPIClientEnhanced:
             self.logger.error(f"❌ Selenium WebDriver初始化失败: {str(e)}")
             return False
     
+    def _driver_alive(self) -> bool:
+        """检查WebDriver会话是否仍可用"""
+        try:
+            # 浏览器崩溃时抛出WebDriverException，chromedriver退出时抛出连接错误
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+    
     def initialize_session_with_selenium(self) -> bool:
         """使用Selenium初始化会话"""
         try:
@@ -114,30 +211,15 @@ class TikTokAPIClientEnhanced:
             self.driver.get(Config.SESSION_INIT_CONFIG['home_page_url'])
             time.sleep(3)
             
-            # 获取Cookie并转移到requests session
-            selenium_cookies = self.driver.get_cookies()
-            for cookie in selenium_cookies:
-                self.session.cookies.set(
-                    cookie['name'], 
-                    cookie['value'], 
-                    domain=cookie.get('domain', '.tiktok.com')
-                )
-            
-            self.logger.info(f"🍪 获取到 {len(selenium_cookies)} 个Cookie")
-            
             # 访问搜索页面
             search_url = f"{Config.SESSION_INIT_CONFIG['search_page_url']}?q=test"
             self.driver.get(search_url)
             time.sleep(2)
             
-            # 再次获取Cookie（可能有新的）
-            new_cookies = self.driver.get_cookies()
-            for cookie in new_cookies:
-                self.session.cookies.set(
-                    cookie['name'], 
-                    cookie['value'], 
-                    domain=cookie.get('domain', '.tiktok.com')
-                )
+            # 两个页面访问完成后一次性读取浏览器中的Cookie（包括页面脚本写入的Cookie）并转移到session
+            cookies = self._get_browser_cookies()
+            self._apply_cookies(cookies)
+            self.logger.info(f"🍪 获取到 {len(cookies)} 个Cookie")
             
             self._session_initialized = True
             self.logger.info("✅ Selenium会话初始化成功")
@@ -147,6 +229,34 @@ class TikTokAPIClientEnhanced:
             self.logger.error(f"❌ Selenium会话初始化失败: {str(e)}")
             return False
     
+    def _get_browser_cookies(self) -> Dict[str, str]:
+        """读取浏览器中tiktok.com域名下的Cookie（包括页面脚本写入的Cookie）"""
+        try:
+            return {
+                c['name']: c['value'] for c in self.driver.get_cookies()
+                if _is_tiktok_host(c.get('domain', ''))
+            }
+        except Exception as e:
+            self.logger.debug(f"⚠️  读取浏览器Cookie失败: {str(e)}")
+            return {}
+    
+    def _apply_cookies(self, cookies: Dict[str, str]):
+        """将Cookie写入requests session"""
+        for name, value in cookies.items():
+            self.session.cookies.set(name, value, domain='.tiktok.com')
+    
+    def get_session_cookies(self) -> Dict[str, str]:
+        """
+        获取当前会话中的全部Cookie
+        
+        Returns:
+            Cookie名称到值的字典
+        """
+        cookies = self.session.cookies
+        # httpx.Cookies封装了CookieJar，requests的Cookie本身就是CookieJar
+        jar = getattr(cookies, 'jar', cookies)
+        return {cookie.name: cookie.value for cookie in jar}
+    
     def initialize_session(self) -> bool:
         """初始化会话"""
         if self.use_selenium:
@@ -175,7 +285,7 @@ class TikTokAPIClientEnhanced:
             time.sleep(Config.SESSION_INIT_CONFIG['delay_between_requests'])
             
             # 访问搜索页面
-            search_headers = self.session.headers.copy()
+            search_headers = dict(self._base_headers)
             search_headers['referer'] = Config.SESSION_INIT_CONFIG['home_page_url']
             
             search_response = self.session.get(
@@ -201,22 +311,63 @@ class TikTokAPIClientEnhanced:
             return
         
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{name_prefix}_{timestamp}.html"
+            compress = ZSTD_AVAILABLE and Config.DEBUG_CONFIG['compress_responses']
+            # 纳秒时间戳加序号，避免同一秒内的文件互相覆盖
+            filename = f"{name_prefix}_{time.time_ns()}_{next(self._dbg_seq)}.html"
+            if compress:
+                filename += ".zst"
             filepath = os.path.join(Config.DEBUG_CONFIG['response_dir'], filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"Status Code: {response.status_code}\n")
-                f.write(f"Headers: {dict(response.headers)}\n")
-                f.write(f"Cookies: {dict(response.cookies)}\n")
-                f.write("="*50 + "\n")
-                f.write(response.text)
+            if self._dbg_dir_bytes is None:
+                self._dbg_dir_bytes = sum(
+                    e.stat().st_size for e in os.scandir(Config.DEBUG_CONFIG['response_dir']) if e.is_file()
+                )
+            
+            # 以二进制写入原始响应体，避免整段解码为str再重新编码
+            header = (
+                f"Status Code: {response.status_code}\n"
+                f"Headers: {dict(response.headers)}\n"
+                f"Cookies: {dict(response.cookies)}\n"
+                + "="*50 + "\n"
+            )
+            with open(filepath, 'wb') as raw_file:
+                if compress:
+                    with zstandard.ZstdCompressor(level=3).stream_writer(raw_file) as f:
+                        f.write(header.encode('utf-8'))
+                        f.write(response.content)
+                else:
+                    raw_file.write(header.encode('utf-8'))
+                    raw_file.write(response.content)
+            
+            # 只有累计大小越过上限时才重新扫描目录并轮转
+            self._dbg_dir_bytes += os.path.getsize(filepath)
+            if self._dbg_dir_bytes > Config.DEBUG_CONFIG['max_dir_bytes']:
+                self._dbg_dir_bytes = self._rotate_debug_dir()
             
             self.logger.debug(f"📁 调试响应已保存: {filepath}")
             
         except Exception as e:
             self.logger.debug(f"⚠️  保存调试响应失败: {str(e)}")
-
+    
+    def _rotate_debug_dir(self) -> int:
+        """调试目录超过大小上限时，按修改时间删除最旧的文件，返回轮转后的目录大小"""
+        max_bytes = Config.DEBUG_CONFIG['max_dir_bytes']
+        entries = [e for e in os.scandir(Config.DEBUG_CONFIG['response_dir']) if e.is_file()]
+        stats = [(e.path, e.stat()) for e in entries]
+        total = sum(st.st_size for _, st in stats)
+        if total <= max_bytes:
+            return total
+        
+        for path, st in sorted(stats, key=lambda item: item[1].st_mtime):
+            try:
+                os.remove(path)
+                total -= st.st_size
+            except OSError:
+                continue
+            if total <= max_bytes:
+                break
+        return total
+    
     def make_request(self, api_name: str, dynamic_params: Dict[str, Any] = None) -> Optional[Dict]:
         """发起API请求"""
         try:
@@ -227,7 +378,7 @@ class TikTokAPIClientEnhanced:
                     self.logger.error("❌ 会话初始化失败")
                     return None
             
-            api_config = Config.API_CONFIGS.get(api_name)
+            api_config = Config.get_api_config(api_name)
             if not api_config:
                 raise ValueError(f"未找到API配置: {api_name}")
             
@@ -242,16 +393,28 @@ class TikTokAPIClientEnhanced:
             dynamic_headers = Config.get_dynamic_headers(keyword)
             
             self.logger.info(f"🌐 发起API请求: {api_config['method']} {api_config['url']}")
-            self.logger.debug(f"📝 请求参数: {list(params.keys())}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("📝 请求参数: %s", list(params))
+            
+            # 熔断器打开时快速失败，避免在已知故障的接口上耗费超时
+            breaker = self._get_breaker(api_name)
+            if not breaker.allow():
+                self.logger.warning(f"⛔ 接口已熔断，跳过请求: {api_name}")
+                return None
             
             # 发起请求
-            response = self._send_request(
-                method=api_config['method'],
-                url=url,
-                params=params,
-                headers=dynamic_headers,
-                api_name=api_name
-            )
+            try:
+                response = self._send_request(
+                    method=api_config['method'],
+                    url=url,
+                    params=params,
+                    headers=dynamic_headers,
+                    api_name=api_name
+                )
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
             
             return response
             
@@ -259,29 +422,13 @@ class TikTokAPIClientEnhanced:
             self.logger.error(f"💥 API请求异常 [{api_name}]: {str(e)}")
             return None
     
-    def _build_params(self, api_config: Dict, dynamic_params: Dict[str, Any]) -> Dict:
-        """构建请求参数"""
-        params = api_config['params_template'].copy()
-        
-        # 替换动态参数
-        for key, value in params.items():
-            if isinstance(value, str) and '{' in value and '}' in value:
-                try:
-                    params[key] = value.format(**dynamic_params)
-                except KeyError as e:
-                    raise ValueError(f"缺少必需的动态参数: {e}")
-        
-        return params
-    
     def _send_request(self, method: str, url: str, params: Dict = None, headers: Dict = None, api_name: str = "") -> Dict:
         """发送HTTP请求"""
         max_retries = 3
         retry_delay = 1
         
         # 合并请求头
-        request_headers = self.session.headers.copy()
-        if headers:
-            request_headers.update(headers)
+        request_headers = {**self._base_headers, **headers} if headers else self._base_headers
         
         for attempt in range(max_retries):
             try:
@@ -302,30 +449,34 @@ class TikTokAPIClientEnhanced:
                 else:
                     raise ValueError(f"不支持的HTTP方法: {method}")
                 
-                response.raise_for_status()
+                status = response.status_code
+                if status >= 400:
+                    response.raise_for_status()
                 
                 # 保存调试响应
                 self._save_debug_response(response, f"api_{api_name}_{attempt+1}")
                 
-                self.logger.debug(f"📊 响应状态: {response.status_code}, 长度: {len(response.text)}")
-                
-                # 检查响应内容
+                # 响应体只读取一次，后续检查复用bytes，避免response.text整段解码
+                body = response.content
                 content_type = response.headers.get('content-type', '')
-                self.logger.debug(f"📄 响应内容类型: {content_type}")
+                self.logger.debug("📊 响应状态: %s, 长度: %s", status, len(body))
+                self.logger.debug("📄 响应内容类型: %s", content_type)
                 
-                if not response.text.strip():
+                if not body or body.isspace():
                     self.logger.warning("⚠️  收到空响应")
                     raise ValueError("空响应")
                 
-                if 'application/json' not in content_type:
+                if not content_type.startswith(JSON_HINTS):
                     self.logger.warning(f"⚠️  响应不是JSON格式，内容类型: {content_type}")
-                    self.logger.debug(f"📄 响应内容前500字符: {response.text[:500]}")
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("📄 响应内容前500字符: %s", body[:500].decode('utf-8', 'replace'))
                     
                     # 尝试检查是否是重定向页面
-                    if 'text/html' in content_type:
-                        if 'login' in response.text.lower() or 'captcha' in response.text.lower():
+                    if content_type.startswith('text/html'):
+                        lowered = body.lower()
+                        if b'login' in lowered or b'captcha' in lowered:
                             raise ValueError("遇到登录页面或验证码，需要重新初始化会话")
-                        elif response.text.strip().startswith('{'):
+                        elif _JSON_START_RE.match(body):
                             # 有时候content-type不正确但实际是JSON
                             self.logger.info("🔄 尝试解析为JSON（忽略content-type）")
                         else:
@@ -333,36 +484,57 @@ class TikTokAPIClientEnhanced:
                 
                 # 尝试解析JSON
                 try:
-                    return response.json()
+                    return json_loads(body)
                 except json.JSONDecodeError:
-                    # 如果JSON解析失败，尝试提取可能的JSON内容
-                    json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
-                    if json_match:
-                        try:
-                            return json.loads(json_match.group())
-                        except json.JSONDecodeError:
-                            pass
+                    # 如果JSON解析失败，从第一个'{'开始增量解析出第一个完整的JSON对象
+                    embedded = self._parse_embedded_json(response)
+                    if embedded is not None:
+                        return embedded
                     raise
                 
             except json.JSONDecodeError as e:
                 self.logger.warning(f"⚠️  JSON解析失败 (第{attempt + 1}/{max_retries}次): {str(e)}")
-                if Config.DEBUG_CONFIG['verbose_logging']:
-                    self.logger.debug(f"📄 响应内容: {response.text[:1000]}")
+                if Config.DEBUG_CONFIG['verbose_logging'] and self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("📄 响应内容: %s", response.content[:1000].decode('utf-8', 'replace'))
                 
                 if attempt < max_retries - 1:
                     # 重新初始化会话
                     self._session_initialized = False
-                    time.sleep(retry_delay * (2 ** attempt))
+                    # 全抖动指数退避，避免并发重试同时触发
+                    sleep_for = random.uniform(0, min(BACKOFF_CAP, retry_delay * (2 ** attempt)))
+                    time.sleep(sleep_for)
                 else:
                     raise
                     
-            except requests.exceptions.RequestException as e:
+            except _TRANSPORT_ERRORS as e:
                 self.logger.warning(f"⚠️  请求失败 (第{attempt + 1}/{max_retries}次): {str(e)}")
                 if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (2 ** attempt))
+                    sleep_for = random.uniform(0, min(BACKOFF_CAP, retry_delay * (2 ** attempt)))
+                    time.sleep(sleep_for)
                 else:
                     raise
     
+    def _parse_embedded_json(self, response) -> Optional[Dict]:
+        """从非标准响应体中增量解析第一个JSON对象，解析到完整对象即停止"""
+        body = response.content
+        start = body.find(b'{')
+        if start == -1:
+            return None
+        
+        if IJSON_AVAILABLE:
+            stream = io.BytesIO(body)
+            stream.seek(start)
+            try:
+                return next(ijson.items(stream, '', multiple_values=True), None)
+            except ijson.JSONError:
+                return None
+        
+        try:
+            text = response.text
+            return json.JSONDecoder().raw_decode(text, text.find('{'))[0]
+        except json.JSONDecodeError:
+            return None
+    
     def close(self):
         """关闭客户端"""
         if self.driver:
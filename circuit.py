@@ -0,0 +1,41 @@
+import time
+
+
+class CircuitBreaker:
+    """熔断器，连续失败达到阈值后在恢复窗口内快速失败"""
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, fail_threshold: int = 5, recovery_seconds: float = 60):
+        self.fail_threshold = fail_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.fails = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        """
+        判断当前是否允许发起请求
+
+        Returns:
+            OPEN状态且仍在恢复窗口内返回False，否则返回True（窗口结束后转为HALF_OPEN试探）
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_seconds:
+                return False
+            self.state = self.HALF_OPEN
+        return True
+
+    def record_success(self):
+        """记录一次成功，重置为CLOSED状态"""
+        self.state = self.CLOSED
+        self.fails = 0
+
+    def record_failure(self):
+        """记录一次失败，HALF_OPEN试探失败或连续失败达到阈值时打开熔断器"""
+        self.fails += 1
+        if self.state == self.HALF_OPEN or self.fails >= self.fail_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
@@ -1,5 +1,18 @@
+import functools
 import os
-from typing import Dict, Any
+import re
+import string
+import time
+import urllib.parse
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_referer(keyword: str, ts_bucket: int) -> str:
+    """按(关键词, 秒级时间桶)缓存referer，同一秒内的重复请求直接命中"""
+    encoded_keyword = urllib.parse.quote(keyword)
+    return f'https://www.tiktok.com/search?q={encoded_keyword}&t={ts_bucket}000'
 
 
 class Config:
@@ -24,6 +37,8 @@ class Config:
         'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36',
         'referer': 'https://www.tiktok.com/search?q={encoded_keyword}&t={timestamp}',
     }
+    # 无关键词时直接复用的只读请求头视图
+    _DEFAULT_HEADERS_VIEW = MappingProxyType(DEFAULT_HEADERS)
 
     # 会话初始化配置
     SESSION_INIT_CONFIG = {
@@ -42,6 +57,32 @@ class Config:
         'executable_path': None,  # ChromeDriver路径（None表示使用PATH中的）
         'page_load_timeout': 30,
         'implicit_wait': 10,
+        'page_load_strategy': 'eager',  # DOMContentLoaded后即返回，不等待全部资源
+        # 通过CDP屏蔽的资源（图片/样式/字体/视频/统计脚本）
+        'blocked_urls': [
+            '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.css', '*.woff*',
+            '*.mp4', '*.ttf', '*google-analytics*', '*doubleclick*',
+        ],
+    }
+
+    # HTTP连接配置
+    HTTP_CONFIG = {
+        'timeout': 30,  # 单次请求总超时（秒）
+        'pool_connections': 20,  # requests连接池数量（按主机）
+        'pool_maxsize': 50,  # 每个连接池的最大连接数
+        'http2': True,  # 增强客户端使用httpx HTTP/2多路复用（需安装httpx[http2]）
+        'max_connections': 100,  # httpx最大连接数
+        'max_keepalive_connections': 20,  # httpx最大空闲keep-alive连接数
+        'max_concurrent_requests': 5,  # 并发请求上限
+        'connector_limit': 100,  # 连接池总连接数
+        'connector_limit_per_host': 20,  # 单主机连接数
+        'dns_cache_ttl': 300,  # DNS缓存时间（秒）
+    }
+
+    # 熔断配置（按API名称独立统计）
+    CIRCUIT_BREAKER_CONFIG = {
+        'fail_threshold': 5,  # 连续失败次数阈值
+        'recovery_seconds': 60,  # 熔断后恢复窗口（秒）
     }
 
     # 调试配置
@@ -49,6 +90,8 @@ class Config:
         'save_response_content': True,  # 保存响应内容用于调试
         'response_dir': 'debug_responses',  # 调试响应保存目录
         'verbose_logging': True,  # 详细日志
+        'compress_responses': True,  # 使用zstd压缩调试响应（需安装zstandard）
+        'max_dir_bytes': 200 * 1024 * 1024,  # 调试目录大小上限，超出后删除最旧的文件
     }
 
     # Cookie模板 - 这些需要从实际浏览器会话中获取
@@ -117,7 +160,55 @@ class Config:
             os.makedirs(cls.DEBUG_CONFIG['response_dir'])
 
     @classmethod
-    def get_dynamic_headers(cls, keyword: str = "", timestamp: str = "") -> Dict[str, str]:
+    def compile_api_config(cls, api_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将参数模板预编译为构建函数，保存在api_config['_build']中
+
+        构建函数只复制一次模板快照，并对预先找出的模板参数调用绑定好的format_map，
+        请求时不再扫描全部参数。模板引用的全部字段汇总到api_config['_required_params']，
+        用于请求前校验。
+        """
+        template = dict(api_config['params_template'])
+        templated = {
+            k: v for k, v in template.items()
+            if isinstance(v, str) and '{' in v and '}' in v
+        }
+        formatters = [(k, v.format_map) for k, v in templated.items()]
+
+        required = set(api_config.get('dynamic_params', ()))
+        for value in templated.values():
+            for _, field_name, _, _ in string.Formatter().parse(value):
+                if field_name:
+                    required.add(re.split(r'[.\[]', field_name, maxsplit=1)[0])
+
+        def build(dynamic_params: Dict[str, Any]) -> Dict[str, Any]:
+            params = template.copy()
+            for key, format_map in formatters:
+                params[key] = format_map(dynamic_params)
+            return params
+
+        api_config['_build'] = build
+        api_config['_required_params'] = frozenset(required)
+        return api_config
+
+    @classmethod
+    def get_api_config(cls, api_name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取API配置，动态添加的配置在首次获取时预计算
+
+        Args:
+            api_name: API配置名称
+
+        Returns:
+            API配置字典或None
+        """
+        api_config = cls.API_CONFIGS.get(api_name)
+        if api_config is not None and '_build' not in api_config:
+            cls.compile_api_config(api_config)
+        return api_config
+
+    @classmethod
+    def get_dynamic_headers(cls, keyword: str = "", timestamp: str = "") -> Mapping[str, str]:
         """
         获取动态请求头，包含编码后的关键词和时间戳
 
@@ -126,16 +217,20 @@ class Config:
             timestamp: 时间戳
 
         Returns:
-            动态请求头字典
+            动态请求头字典（无关键词时为只读的默认请求头）
         """
-        import urllib.parse
-        import time
+        if not keyword:
+            return cls._DEFAULT_HEADERS_VIEW
 
         headers = cls.DEFAULT_HEADERS.copy()
-
-        if keyword:
+        if timestamp:
             encoded_keyword = urllib.parse.quote(keyword)
-            current_timestamp = timestamp or str(int(time.time() * 1000))
-            headers['referer'] = f'https://www.tiktok.com/search?q={encoded_keyword}&t={current_timestamp}'
+            headers['referer'] = f'https://www.tiktok.com/search?q={encoded_keyword}&t={timestamp}'
+        else:
+            headers['referer'] = _cached_referer(keyword, int(time.time()))
 
         return headers
+
+
+for _api_config in Config.API_CONFIGS.values():
+    Config.compile_api_config(_api_config)
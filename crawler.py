@@ -1,11 +1,110 @@
+import asyncio
+import base64
+import itertools
 import logging
+import random
 import time
-import json
 import os
 import re
-from typing import Dict, List, Optional
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
 from api_client_enhanced import TikTokAPIClientEnhanced
+from api_client_async import AsyncTikTokAPIClient, AIOHTTP_AVAILABLE
+from config import Config
 from data_processor import DataProcessor
+from http_common import json_loads
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# 批量爬取时每个关键词完成后的随机延时范围（秒）
+_KEYWORD_DELAY_RANGE = (0.5, 1.5)
+
+# 统计数据量时依次检查的列表字段
+_COUNT_KEYS = ('sug_list', 'search_results', 'data')
+
+# 性能日志中需要解析的事件（带结尾引号，排除responseReceivedExtraInfo）
+_RESPONSE_RECEIVED = '"Network.responseReceived"'
+_LOADING_FINISHED = '"Network.loadingFinished"'
+
+# 需要拦截的API路径
+_API_URL_RE = re.compile(r'/api/(?:search/general/preview|search/item|search|recommend)/')
+
+# 拦截到多个响应时优先返回的API路径
+_PRIORITY_RE = re.compile(r'/api/search/general/preview/')
+
+# 页面源码中可能的JSON片段（包含"id"字段的扁平对象）及最多保留的数量
+_JSON_FRAG_RE = re.compile(r'\{[^{}]*"id"[^{}]*\}')
+_MAX_JSON_FRAGMENTS = 5
+
+# 调试截图的JPEG质量
+_SCREENSHOT_QUALITY = 40
+
+# 查找视频元素的选择器（按优先级）
+_VIDEO_SELECTORS = (
+    "[data-e2e='search-card-item']",
+    "[data-e2e='search-video-item']",
+    "[data-e2e*='search']",
+    "div[class*='DivItemContainer']",
+    "div[class*='video']",
+    "a[href*='/video/']",
+    "div[data-e2e]",
+    ".tiktok-yz6ijl-DivWrapper",
+    ".tiktok-x6y88p-DivItemContainerV2"
+)
+
+# 在页面内按优先级依次尝试选择器，返回第一个有匹配的选择器及其元素
+_FIND_BY_SELECTORS_JS = """
+for (const selector of arguments[0]) {
+    let elements;
+    try {
+        elements = document.querySelectorAll(selector);
+    } catch (e) {
+        continue;
+    }
+    if (elements.length) {
+        return [selector, Array.from(elements)];
+    }
+}
+return [null, []];
+"""
+
+# 视频卡片中查找标题的选择器（按优先级）
+_TITLE_SELECTORS = ['h1', 'h2', 'h3', '[data-e2e*="title"]', 'strong', '.title']
+
+# 选择器都未命中时的备用查找：直接包含链接的div，单次查询完成筛选
+_LINK_DIV_SELECTOR = 'div:has(> a)'
+
+# 在页面内一次性提取元素信息，避免逐个元素、逐个属性的WebDriver往返
+_EXTRACT_ELEMENTS_JS = """
+const titleSelectors = arguments[1];
+return Array.from(arguments[0]).map(function (el) {
+    const link = el.tagName === 'A' ? el : el.querySelector('a');
+    const img = el.querySelector('img');
+    let title = '';
+    for (const selector of titleSelectors) {
+        const node = el.querySelector(selector);
+        if (node && node.innerText && node.innerText.trim()) {
+            title = node.innerText.trim();
+            break;
+        }
+    }
+    return {
+        text: el.innerText || '',
+        tag: el.tagName.toLowerCase(),
+        cls: el.getAttribute('class') || '',
+        e2e: el.getAttribute('data-e2e') || '',
+        id: el.id || '',
+        href: link ? link.href : '',
+        img: img ? img.src : '',
+        title: title
+    };
+});
+"""
 
 
 class TikTokCrawler:
@@ -26,6 +125,19 @@ class TikTokCrawler:
         Returns:
             保存的Excel文件路径或None
         """
+        future = self._submit_search_preview(keyword)
+        return self._wait_saved(keyword, future)
+
+    def _submit_search_preview(self, keyword: str) -> Optional[Future]:
+        """
+        获取搜索预览数据并提交后台保存
+
+        Args:
+            keyword: 搜索关键词
+
+        Returns:
+            保存任务的Future，数据获取失败时为None
+        """
         try:
             self.logger.info(f"📝 任务开始 - 关键词: {keyword}")
 
@@ -45,33 +157,111 @@ class TikTokCrawler:
                 self.logger.error(f"❌ 数据获取失败 - 关键词: {keyword}")
                 return None
 
-            # 统计获取的数据量
-            data_count = 0
-            if isinstance(response_data, dict):
-                if 'sug_list' in response_data:
-                    data_count = len(response_data['sug_list'])
-                elif 'search_results' in response_data:
-                    data_count = len(response_data['search_results'])
-                elif isinstance(response_data.get('data'), list):
-                    data_count = len(response_data['data'])
-
-            self.logger.info(f"📊 数据获取成功 - 共 {data_count} 条记录")
-
-            # 保存为Excel
-            self.logger.info("💾 开始保存Excel文件...")
-            excel_path = self.data_processor.save_to_excel(
-                data=response_data,
-                api_name='search_preview',
-                keyword=keyword
+            return self._save_response(keyword, response_data)
+
+        except Exception as e:
+            self.logger.error(f"💥 爬取异常 - 关键词: {keyword}, 错误: {str(e)}")
+            return None
+
+    async def crawl_search_preview_async(self, client: AsyncTikTokAPIClient, keyword: str,
+                                         selenium_lock: asyncio.Lock) -> Optional[str]:
+        """
+        异步爬取搜索预览接口
+
+        Args:
+            client: 异步API客户端
+            keyword: 搜索关键词
+            selenium_lock: Selenium驱动锁，WebDriver不支持并发操作
+
+        Returns:
+            保存的Excel文件路径或None
+        """
+        try:
+            self.logger.info(f"📝 任务开始 - 关键词: {keyword}")
+
+            response_data = await client.make_request(
+                api_name='search_general_preview',
+                dynamic_params={'keyword': keyword}
             )
 
-            self.logger.info(f"✅ 文件保存成功: {os.path.basename(excel_path)}")
-            return excel_path
+            # 如果API请求失败，在线程中使用Selenium直接获取数据
+            if response_data is None and self.api_client.use_selenium:
+                self.logger.info("🤖 API请求失败，启用Selenium模式...")
+                async with selenium_lock:
+                    response_data = await asyncio.to_thread(self._crawl_with_selenium_fallback, keyword)
+
+            if response_data is None:
+                self.logger.error(f"❌ 数据获取失败 - 关键词: {keyword}")
+                return None
+
+            future = await asyncio.to_thread(self._save_response, keyword, response_data)
+            # 等待后台写入完成，期间其他关键词继续请求
+            await asyncio.wait([asyncio.wrap_future(future)])
+            return self._wait_saved(keyword, future)
 
         except Exception as e:
             self.logger.error(f"💥 爬取异常 - 关键词: {keyword}, 错误: {str(e)}")
             return None
 
+    def _save_response(self, keyword: str, response_data: Dict) -> Future:
+        """
+        统计数据量并提交后台保存为Excel
+
+        Args:
+            keyword: 搜索关键词
+            response_data: 获取到的数据
+
+        Returns:
+            保存任务的Future，结果为实际保存的文件路径或None
+        """
+        # 统计获取的数据量
+        data_count = 0
+        if isinstance(response_data, dict):
+            data_count = next((len(response_data[k]) for k in _COUNT_KEYS
+                               if isinstance(response_data.get(k), list)), 0)
+
+        self.logger.info(f"📊 数据获取成功 - 共 {data_count} 条记录")
+
+        # 保存为Excel（后台写入）
+        future = self.data_processor.save_to_excel(
+            data=response_data,
+            api_name='search_preview',
+            keyword=keyword
+        )
+        self.logger.info(f"💾 文件已提交后台写入 - 关键词: {keyword}")
+        return future
+
+    def _wait_saved(self, keyword: str, future: Optional[Future]) -> Optional[str]:
+        """
+        等待后台保存完成并记录结果
+
+        Args:
+            keyword: 搜索关键词
+            future: 保存任务的Future，为None表示数据获取失败
+
+        Returns:
+            实际保存的文件路径或None
+        """
+        if future is None:
+            return None
+        try:
+            path = future.result()
+        except Exception as e:
+            self.logger.error(f"❌ 文件保存失败 - 关键词: {keyword}, 错误: {str(e)}")
+            return None
+        if path:
+            self.logger.info(f"✅ 文件保存成功: {os.path.basename(path)}")
+        else:
+            self.logger.error(f"❌ 文件保存失败 - 关键词: {keyword}")
+        return path
+
+    def _crawl_with_selenium_fallback(self, keyword: str) -> Optional[Dict]:
+        """异步流程中未经过增强客户端初始化时，先初始化Selenium会话再获取数据"""
+        if not self.api_client.driver and not self.api_client.initialize_session():
+            self.logger.error("🤖 Selenium会话初始化失败")
+            return None
+        return self._crawl_with_selenium_direct(keyword)
+
     def _crawl_with_selenium_direct(self, keyword: str) -> Optional[Dict]:
         """
         使用Selenium直接从页面获取数据
@@ -96,13 +286,17 @@ class TikTokCrawler:
             encoded_keyword = quote(keyword)
             search_url = f"https://www.tiktok.com/search?q={encoded_keyword}"
 
+            # 丢弃之前的性能日志，拦截时只解析本次搜索产生的网络请求
+            try:
+                self.api_client.driver.get_log('performance')
+            except Exception as e:
+                self.logger.debug(f"清空性能日志失败: {str(e)}")
+
             self.logger.info(f"🌍 访问搜索页面: {search_url}")
             self.api_client.driver.get(search_url)
 
+            # 等待搜索结果加载（轮询，结果出现即返回）
             self.logger.info("⏳ 等待页面加载...")
-            time.sleep(5)
-
-            # 等待搜索结果加载
             try:
                 WebDriverWait(self.api_client.driver, 10).until(
                     EC.presence_of_element_located(
@@ -136,51 +330,53 @@ class TikTokCrawler:
             # 获取浏览器日志
             logs = self.api_client.driver.get_log('performance')
 
-            api_responses = []
-
+            # 先用字符串过滤，只解析响应相关的日志；记录匹配的请求及已加载完成的请求
+            candidates = {}
+            finished = set()
             for log in logs:
+                raw = log['message']
                 try:
-                    message = json.loads(log['message'])
-                    if message['message']['method'] == 'Network.responseReceived':
-                        url = message['message']['params']['response']['url']
+                    if _RESPONSE_RECEIVED in raw:
+                        params = json_loads(raw)['message']['params']
+                        url = params['response']['url']
                         # 检查多种可能的API路径
-                        if any(api_path in url for api_path in [
-                            '/api/search/general/preview/',
-                            '/api/search/item/',
-                            '/api/search/',
-                            '/api/recommend/',
-                            'search'
-                        ]):
-                            request_id = message['message']['params']['requestId']
-
-                            # 尝试获取响应体
-                            try:
-                                response_body = self.api_client.driver.execute_cdp_cmd(
-                                    'Network.getResponseBody',
-                                    {'requestId': request_id}
-                                )
-
-                                if response_body and 'body' in response_body:
-                                    body_data = json.loads(
-                                        response_body['body'])
-                                    api_responses.append({
-                                        'url': url,
-                                        'data': body_data
-                                    })
-                                    self.logger.info(f"成功拦截API响应: {url}")
-
-                            except Exception as e:
-                                self.logger.debug(f"获取响应体失败 {url}: {str(e)}")
-                                continue
+                        if _API_URL_RE.search(url):
+                            candidates[params['requestId']] = url
+                    elif _LOADING_FINISHED in raw:
+                        finished.add(json_loads(raw)['message']['params']['requestId'])
                 except Exception as e:
                     self.logger.debug(f"解析日志失败: {str(e)}")
                     continue
 
+            # 只为已加载完成的匹配请求获取响应体
+            pending = []
+            for request_id, url in candidates.items():
+                if request_id in finished:
+                    pending.append((request_id, url))
+                else:
+                    self.logger.debug(f"响应尚未加载完成，跳过: {url}")
+
+            # 逐个获取响应体（同一WebDriver会话只能串行执行命令），结果按日志中的出现顺序排列
+            api_responses = []
+            driver = self.api_client.driver
+            for request_id, url in pending:
+                try:
+                    response_body = driver.execute_cdp_cmd(
+                        'Network.getResponseBody', {'requestId': request_id})
+                    if response_body and 'body' in response_body:
+                        api_responses.append({
+                            'url': url,
+                            'data': json_loads(response_body['body'])
+                        })
+                        self.logger.info(f"成功拦截API响应: {url}")
+                except Exception as e:
+                    self.logger.debug(f"获取响应体失败 {url}: {str(e)}")
+
             # 返回最相关的API响应
             if api_responses:
                 # 优先返回search/general/preview的响应
                 for response in api_responses:
-                    if '/api/search/general/preview/' in response['url']:
+                    if _PRIORITY_RE.search(response['url']):
                         return response['data']
 
                 # 如果没有找到，返回第一个包含数据的响应
@@ -205,147 +401,81 @@ class TikTokCrawler:
         """
         try:
             from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
 
-            # 等待页面完全加载
-            time.sleep(3)
-
-            # 尝试多种选择器来查找视频元素
-            selectors = [
-                "[data-e2e='search-card-item']",
-                "[data-e2e='search-video-item']",
-                "[data-e2e*='search']",
-                "div[class*='DivItemContainer']",
-                "div[class*='video']",
-                "a[href*='/video/']",
-                "div[data-e2e]",
-                ".tiktok-yz6ijl-DivWrapper",
-                ".tiktok-x6y88p-DivItemContainerV2"
-            ]
-
-            video_elements = []
-            for selector in selectors:
-                try:
-                    elements = self.api_client.driver.find_elements(
-                        By.CSS_SELECTOR, selector)
-                    if elements:
-                        video_elements = elements
-                        self.logger.info(
-                            f"使用选择器找到元素: {selector} ({len(elements)}个)")
-                        break
-                except Exception as e:
-                    self.logger.debug(f"选择器失败 {selector}: {str(e)}")
-                    continue
-
-            # 如果还是没找到，尝试查找所有包含链接的div
-            if not video_elements:
-                try:
-                    all_divs = self.api_client.driver.find_elements(
-                        By.TAG_NAME, "div")
-                    video_elements = [
-                        div for div in all_divs if div.find_elements(By.TAG_NAME, "a")]
-                    self.logger.info(f"通过div+a查找到 {len(video_elements)} 个潜在元素")
-                except Exception as e:
-                    self.logger.debug(f"备用查找失败: {str(e)}")
+            # 等待页面完全加载（轮询readyState，加载完成即返回）
+            try:
+                WebDriverWait(self.api_client.driver, 5).until(
+                    lambda d: d.execute_script('return document.readyState') == 'complete')
+            except Exception:
+                self.logger.debug("等待页面加载完成超时，继续提取")
 
+            driver = self.api_client.driver
             extracted_data = {
                 'keyword': keyword,
                 'search_results': [],
-                'total_count': len(video_elements),
+                'total_count': 0,
                 'extraction_method': 'selenium_page_elements',
                 'timestamp': int(time.time()),
-                'page_url': self.api_client.driver.current_url,
-                'page_title': self.api_client.driver.title
+                'page_url': driver.current_url,
+                'page_title': driver.title
             }
 
-            self.logger.info(f"🎯 找到 {len(video_elements)} 个页面元素")
-
             # 保存页面截图用于调试
-            try:
-                screenshot_path = f"debug_responses/page_screenshot_{int(time.time())}.png"
-                self.api_client.driver.save_screenshot(screenshot_path)
-                self.logger.debug(f"页面截图已保存: {screenshot_path}")
-            except Exception as e:
-                self.logger.debug(f"保存截图失败: {str(e)}")
+            self._save_screenshot()
 
-            for i, element in enumerate(video_elements[:20]):  # 限制提取前20个
+            # 优先取回一次页面源码在本地解析，无需逐个元素与浏览器交互
+            page_source = None
+            raw_items = []
+            if SELECTOLAX_AVAILABLE:
                 try:
-                    # 滚动到元素可见区域
-                    try:
-                        self.api_client.driver.execute_script(
-                            "arguments[0].scrollIntoView(true);", element)
-                        time.sleep(0.1)
-                    except:
-                        pass
-
-                    # 基本元素信息
-                    video_data = {
-                        'index': i,
-                        'element_text': element.text.strip()[:500] if element.text else '',
-                        'element_tag': element.tag_name,
-                        'element_class': element.get_attribute('class') or '',
-                        'data_e2e': element.get_attribute('data-e2e') or '',
-                        'element_id': element.get_attribute('id') or '',
-                    }
-
-                    # 尝试提取链接
-                    try:
-                        link_elements = element.find_elements(By.TAG_NAME, 'a')
-                        if link_elements:
-                            href = link_elements[0].get_attribute('href')
-                            if href and 'tiktok.com' in href:
-                                video_data['video_url'] = href
-                    except:
-                        pass
-
-                    # 尝试提取图片
-                    try:
-                        img_elements = element.find_elements(
-                            By.TAG_NAME, 'img')
-                        if img_elements:
-                            src = img_elements[0].get_attribute('src')
-                            if src:
-                                video_data['thumbnail_url'] = src
-                    except:
-                        pass
-
-                    # 尝试提取标题和描述
-                    try:
-                        # 查找标题元素
-                        title_selectors = [
-                            'h1', 'h2', 'h3', '[data-e2e*="title"]', 'strong', '.title']
-                        for selector in title_selectors:
-                            try:
-                                title_elements = element.find_elements(
-                                    By.CSS_SELECTOR, selector)
-                                if title_elements and title_elements[0].text.strip():
-                                    video_data['title'] = title_elements[0].text.strip(
-                                    )
-                                    break
-                            except:
-                                continue
-                    except:
-                        pass
-
-                    # 只保存有用的数据
-                    if (video_data.get('video_url') or
-                        video_data.get('element_text') or
-                            video_data.get('title')):
-                        extracted_data['search_results'].append(video_data)
-
+                    page_source = driver.page_source
+                    extracted_data['total_count'], raw_items = self._extract_items_from_source(
+                        page_source, extracted_data['page_url'])
                 except Exception as e:
-                    self.logger.debug(f"提取第{i}个元素数据失败: {str(e)}")
-                    continue
+                    self.logger.debug(f"解析页面源码失败: {str(e)}")
+
+            if not raw_items:
+                extracted_data['total_count'], raw_items = self._extract_items_from_driver()
+
+            self.logger.info(f"🎯 找到 {extracted_data['total_count']} 个页面元素")
+
+            for i, item in enumerate(raw_items):
+                # 基本元素信息
+                video_data = {
+                    'index': i,
+                    'element_text': item['text'].strip()[:500],
+                    'element_tag': item['tag'],
+                    'element_class': item['cls'],
+                    'data_e2e': item['e2e'],
+                    'element_id': item['id'],
+                }
+
+                if item['href'] and 'tiktok.com' in item['href']:
+                    video_data['video_url'] = item['href']
+                if item['img']:
+                    video_data['thumbnail_url'] = item['img']
+                if item['title']:
+                    video_data['title'] = item['title']
+
+                # 只保存有用的数据
+                if (video_data.get('video_url') or
+                    video_data.get('element_text') or
+                        video_data.get('title')):
+                    extracted_data['search_results'].append(video_data)
 
             # 如果没有提取到有效数据，尝试获取页面源码中的结构化数据
             if not extracted_data['search_results']:
                 try:
-                    page_source = self.api_client.driver.page_source
-                    # 查找可能的JSON数据
-                    json_matches = re.findall(
-                        r'\{[^{}]*"id"[^{}]*\}', page_source)
+                    if page_source is None:
+                        page_source = driver.page_source
+                    # 查找可能的JSON数据，找到前5个匹配项即停止扫描
+                    json_matches = [
+                        m.group(0) for m in itertools.islice(
+                            _JSON_FRAG_RE.finditer(page_source), _MAX_JSON_FRAGMENTS)
+                    ]
                     if json_matches:
-                        # 保存前5个匹配项
-                        extracted_data['raw_json_data'] = json_matches[:5]
+                        extracted_data['raw_json_data'] = json_matches
                         self.logger.info(
                             f"从页面源码中提取到 {len(json_matches)} 个JSON片段")
                 except Exception as e:
@@ -371,6 +501,118 @@ class TikTokCrawler:
             self.logger.error(f"📄 页面元素提取失败: {str(e)}")
             return None
 
+    def _extract_items_from_source(self, page_source: str, page_url: str) -> Tuple[int, List[Dict]]:
+        """
+        用selectolax在本地解析页面源码，提取视频元素信息
+
+        Args:
+            page_source: 页面HTML源码
+            page_url: 页面URL，用于补全相对链接
+
+        Returns:
+            (找到的元素数量, 前20个元素的信息列表)，字段与页面内脚本提取的结果一致
+        """
+        tree = HTMLParser(page_source)
+        # 与innerText一致，元素文本不包括脚本和样式内容
+        tree.strip_tags(['script', 'style', 'noscript'])
+
+        nodes = []
+        for selector in _VIDEO_SELECTORS:
+            try:
+                nodes = tree.css(selector)
+            except Exception as e:
+                self.logger.debug(f"选择器失败 {selector}: {str(e)}")
+                continue
+            if nodes:
+                self.logger.info(f"使用选择器找到元素: {selector} ({len(nodes)}个)")
+                break
+
+        # 如果还是没找到，查找包含链接的div
+        if not nodes:
+            nodes = tree.css(_LINK_DIV_SELECTOR)
+            self.logger.info(f"通过div+a查找到 {len(nodes)} 个潜在元素")
+
+        items = []
+        for node in nodes[:20]:
+            attrs = node.attributes
+            link = node if node.tag == 'a' else node.css_first('a')
+            img = node.css_first('img')
+            href = link.attributes.get('href') if link is not None else None
+            src = img.attributes.get('src') if img is not None else None
+
+            title = ''
+            for selector in _TITLE_SELECTORS:
+                title_node = node.css_first(selector)
+                if title_node is not None:
+                    title = title_node.text(separator='\n', strip=True)
+                    if title:
+                        break
+
+            items.append({
+                'text': node.text(separator='\n', strip=True),
+                'tag': node.tag,
+                'cls': attrs.get('class') or '',
+                'e2e': attrs.get('data-e2e') or '',
+                'id': attrs.get('id') or '',
+                'href': urljoin(page_url, href) if href else '',
+                'img': urljoin(page_url, src) if src else '',
+                'title': title
+            })
+        return len(nodes), items
+
+    def _extract_items_from_driver(self) -> Tuple[int, List[Dict]]:
+        """
+        在浏览器中执行脚本提取视频元素信息（未安装selectolax或本地解析无结果时使用）
+
+        Returns:
+            (找到的元素数量, 前20个元素的信息列表)
+        """
+        from selenium.webdriver.common.by import By
+
+        driver = self.api_client.driver
+
+        # 尝试多种选择器来查找视频元素（单次脚本调用内按优先级依次尝试）
+        video_elements = []
+        try:
+            selector, elements = driver.execute_script(
+                _FIND_BY_SELECTORS_JS, list(_VIDEO_SELECTORS))
+            if elements:
+                video_elements = elements
+                self.logger.info(
+                    f"使用选择器找到元素: {selector} ({len(elements)}个)")
+        except Exception as e:
+            self.logger.debug(f"选择器查找失败: {str(e)}")
+
+        # 如果还是没找到，尝试查找包含链接的div
+        if not video_elements:
+            try:
+                video_elements = driver.find_elements(By.CSS_SELECTOR, _LINK_DIV_SELECTOR)
+                self.logger.info(f"通过div+a查找到 {len(video_elements)} 个潜在元素")
+            except Exception as e:
+                self.logger.debug(f"备用查找失败: {str(e)}")
+
+        # 限制提取前20个，单次脚本调用取回全部元素信息
+        try:
+            raw_items = driver.execute_script(
+                _EXTRACT_ELEMENTS_JS, video_elements[:20], _TITLE_SELECTORS)
+        except Exception as e:
+            self.logger.debug(f"批量提取元素数据失败: {str(e)}")
+            raw_items = []
+        return len(video_elements), raw_items
+
+    def _save_screenshot(self):
+        """保存页面截图用于调试，使用低质量JPEG截图，编码和写入开销远小于PNG"""
+        screenshot_path = os.path.join(
+            Config.DEBUG_CONFIG['response_dir'], f"page_screenshot_{int(time.time())}.jpg")
+        try:
+            result = self.api_client.driver.execute_cdp_cmd(
+                'Page.captureScreenshot', {'format': 'jpeg', 'quality': _SCREENSHOT_QUALITY})
+            with open(screenshot_path, 'wb') as f:
+                f.write(base64.b64decode(result['data']))
+            self.logger.debug(f"页面截图已保存: {screenshot_path}")
+        except Exception as e:
+            self.logger.debug(f"保存截图失败: {str(e)}")
+
     def crawl_multiple_keywords(self, keywords: List[str]) -> List[str]:
         """
         批量爬取多个关键词
@@ -379,24 +621,73 @@ class TikTokCrawler:
             keywords: 关键词列表
 
         Returns:
-            成功保存的CSV文件路径列表
+            成功保存的文件路径列表
         """
-        successful_files = []
+        if AIOHTTP_AVAILABLE:
+            return asyncio.run(self.crawl_multiple_keywords_async(keywords))
+
+        # 文件在后台写入，先提交全部关键词，最后再等待写入结果
+        submitted = []
 
         for keyword in keywords:
             try:
-                csv_path = self.crawl_search_preview(keyword)
-                if csv_path:
-                    successful_files.append(csv_path)
+                future = self._submit_search_preview(keyword)
+                if future is not None:
+                    submitted.append((keyword, future))
 
                 # 添加延时避免请求过快
-                import time
                 time.sleep(1)
 
             except Exception as e:
                 self.logger.error(f"处理关键词 {keyword} 时出错: {str(e)}")
                 continue
 
+        successful_files = []
+        for keyword, future in submitted:
+            path = self._wait_saved(keyword, future)
+            if path:
+                successful_files.append(path)
+
+        return successful_files
+
+    async def crawl_multiple_keywords_async(self, keywords: List[str], concurrency: int = None) -> List[str]:
+        """
+        并发批量爬取多个关键词
+
+        Args:
+            keywords: 关键词列表
+            concurrency: 同时处理的关键词数量，默认取HTTP_CONFIG['max_concurrent_requests']
+
+        Returns:
+            成功保存的文件路径列表
+        """
+        semaphore = asyncio.Semaphore(concurrency or Config.HTTP_CONFIG['max_concurrent_requests'])
+        selenium_lock = asyncio.Lock()
+
+        async with AsyncTikTokAPIClient() as client:
+            # 异步客户端自行初始化只有配置中的默认Cookie，先通过Selenium会话获取实时Cookie再共享给它
+            if self.api_client.use_selenium:
+                if await asyncio.to_thread(self.api_client.initialize_session):
+                    client.import_cookies(self.api_client.get_session_cookies())
+                else:
+                    self.logger.warning("Selenium会话初始化失败，异步客户端使用默认Cookie")
+
+            async def bounded(keyword: str) -> Optional[str]:
+                async with semaphore:
+                    path = await self.crawl_search_preview_async(client, keyword, selenium_lock)
+                    # 在信号量内等待，延时与其他关键词的请求重叠，避免请求过快
+                    await asyncio.sleep(random.uniform(*_KEYWORD_DELAY_RANGE))
+                    return path
+
+            results = await asyncio.gather(*[bounded(k) for k in keywords], return_exceptions=True)
+
+        successful_files = []
+        for keyword, result in zip(keywords, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"处理关键词 {keyword} 时出错: {str(result)}")
+            elif result:
+                successful_files.append(result)
+
         return successful_files
 
     def add_api_config(self, api_name: str, config: Dict):
@@ -407,10 +698,10 @@ class TikTokCrawler:
             api_name: API名称
             config: API配置
         """
-        from config import Config
-        Config.API_CONFIGS[api_name] = config
+        Config.API_CONFIGS[api_name] = Config.compile_api_config(config)
         self.logger.info(f"已添加新的API配置: {api_name}")
 
     def close(self):
         """关闭爬虫，释放资源"""
         self.api_client.close()
+        self.data_processor.close()
@@ -1,104 +1,163 @@
-import csv
 import json
+import logging
 import os
-import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 from config import Config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Excel列宽上限
+_MAX_COLUMN_WIDTH = 50
+
+# 后台写文件的线程数
+_WRITER_WORKERS = 2
+
 class DataProcessor:
     """数据处理类，负责数据转换和存储"""
     
     def __init__(self):
         Config.ensure_output_dir()
-        
-    def save_to_excel(self, data: Dict, api_name: str, keyword: str = "") -> str:
+        # 日期 -> 已创建的日期目录
+        self._date_dir_cache: Dict[str, str] = {}
+        # 文件写入在后台线程完成，与后续关键词的网络请求重叠
+        self._writer_pool = ThreadPoolExecutor(max_workers=_WRITER_WORKERS)
+        self.logger = logging.getLogger(__name__)
+        
+    def _get_date_dir(self, date_str: str) -> str:
+        """获取按日期分类的输出目录，每天只创建一次"""
+        date_dir = self._date_dir_cache.get(date_str)
+        if date_dir is None:
+            date_dir = os.path.join(Config.OUTPUT_DIR, date_str)
+            os.makedirs(date_dir, exist_ok=True)
+            self._date_dir_cache[date_str] = date_dir
+        return date_dir
+        
+    def save_to_excel(self, data: Dict, api_name: str, keyword: str = "") -> Future:
         """
         将API响应数据保存为Excel文件，按日期分类存储
         
+        数据在调用线程中准备好后交给后台线程写入，调用close()等待全部写入完成
+        
         Args:
             data: API响应数据
             api_name: API名称
             keyword: 搜索关键词
             
         Returns:
-            保存的文件路径
+            写入任务的Future，结果为实际保存的文件路径（回退时为CSV路径），失败时为None
+        """
+        filepath, df, metadata, raw_json_data = self._prepare(data, api_name, keyword, '.xlsx')
+        return self._writer_pool.submit(self._write_excel, filepath, df, metadata, raw_json_data)
+    
+    def _prepare(self, data: Dict, api_name: str, keyword: str, ext: str):
+        """
+        准备待写入的数据：生成文件路径、扁平化数据并整理元数据
+        
+        Returns:
+            (文件路径, 数据DataFrame, 元数据字典, 原始JSON片段列表或None)
         """
+        # pandas导入开销较大，只在真正保存时加载
+        import pandas as pd
+        
         # 创建日期目录
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        date_dir = os.path.join(Config.OUTPUT_DIR, date_str)
-        if not os.path.exists(date_dir):
-            os.makedirs(date_dir)
+        now = datetime.now()
+        date_dir = self._get_date_dir(now.strftime("%Y-%m-%d"))
         
         # 生成文件名
-        timestamp = datetime.now().strftime("%H%M%S")
+        timestamp = now.strftime("%H%M%S")
         keyword_suffix = f"_{keyword}" if keyword else ""
-        filename = f"{api_name}{keyword_suffix}_{timestamp}.xlsx"
+        filename = f"{api_name}{keyword_suffix}_{timestamp}{ext}"
         filepath = os.path.join(date_dir, filename)
         
         # 提取并扁平化数据
-        flattened_data = self._flatten_json(data)
+        df = self._to_dataframe(data)
         
-        if not flattened_data:
+        if df.empty:
             # 如果没有数据，至少保存原始响应结构
-            flattened_data = [{'raw_response': json.dumps(data, ensure_ascii=False)}]
+            df = pd.DataFrame({'raw_response': [self._dumps(data)]})
+        
+        # 元数据
+        metadata = {
+            '爬取时间': now.strftime("%Y-%m-%d %H:%M:%S"),
+            '关键词': keyword,
+            'API名称': api_name,
+            '数据条数': len(df),
+            '提取方法': data.get('extraction_method', 'api_request')
+        }
+        
+        if 'page_url' in data:
+            metadata['页面URL'] = data['page_url']
+        if 'total_count' in data:
+            metadata['总数量'] = data['total_count']
+        
+        return filepath, df, metadata, data.get('raw_json_data')
+    
+    def _write_excel(self, filepath: str, df: 'pd.DataFrame', metadata: Dict[str, Any],
+                     raw_json_data: Optional[List[str]]) -> Optional[str]:
+        """在后台线程中写入Excel文件，失败时回退到同名CSV，返回实际写入的路径或None"""
+        import pandas as pd
         
-        # 转换为DataFrame并保存为Excel
         try:
-            df = pd.DataFrame(flattened_data)
-            
             # 使用ExcelWriter来更好地控制格式
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+            with pd.ExcelWriter(filepath, engine='xlsxwriter') as writer:
                 # 主数据表
-                df.to_excel(writer, sheet_name='搜索数据', index=False)
-                
-                # 元数据表
-                metadata = {
-                    '爬取时间': [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                    '关键词': [keyword],
-                    'API名称': [api_name],
-                    '数据条数': [len(flattened_data)],
-                    '提取方法': [data.get('extraction_method', 'api_request')]
-                }
-                
-                if 'page_url' in data:
-                    metadata['页面URL'] = [data['page_url']]
-                if 'total_count' in data:
-                    metadata['总数量'] = [data['total_count']]
+                self._write_sheet(writer, df, '搜索数据')
                 
-                metadata_df = pd.DataFrame(metadata)
-                metadata_df.to_excel(writer, sheet_name='元数据', index=False)
+                # 元数据表（单行数据，直接逐行写入，无需构建DataFrame）
+                worksheet = writer.book.add_worksheet('元数据')
+                worksheet.write_row(0, 0, list(metadata.keys()))
+                worksheet.write_row(1, 0, list(metadata.values()))
+                for i, (key, value) in enumerate(metadata.items()):
+                    width = max(len(str(key)), len(str(value)))
+                    worksheet.set_column(i, i, min(width + 2, _MAX_COLUMN_WIDTH))
                 
                 # 如果有原始JSON数据，保存到第三个表
-                if 'raw_json_data' in data:
-                    raw_json_df = pd.DataFrame({
-                        '原始JSON': data['raw_json_data']
-                    })
-                    raw_json_df.to_excel(writer, sheet_name='原始数据', index=False)
-                
-                # 自动调整列宽
-                for sheet_name in writer.sheets:
-                    worksheet = writer.sheets[sheet_name]
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)  # 限制最大宽度
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
+                if raw_json_data is not None:
+                    worksheet = writer.book.add_worksheet('原始数据')
+                    worksheet.write_string(0, 0, '原始JSON')
+                    width = len('原始JSON')
+                    for row, fragment in enumerate(raw_json_data, start=1):
+                        fragment = str(fragment)
+                        worksheet.write_string(row, 0, fragment)
+                        width = max(width, len(fragment))
+                    worksheet.set_column(0, 0, min(width + 2, _MAX_COLUMN_WIDTH))
             
+            self.logger.debug(f"Excel文件写入完成: {filepath}")
             return filepath
             
         except Exception as e:
             # 如果Excel保存失败，回退到CSV
-            print(f"Excel保存失败，回退到CSV: {str(e)}")
-            return self.save_to_csv(data, api_name, keyword)
+            csv_path = os.path.splitext(filepath)[0] + '.csv'
+            self.logger.error(f"Excel保存失败，回退到CSV {csv_path}: {str(e)}")
+            return self._write_csv(csv_path, df)
+    
+    def _write_sheet(self, writer: 'pd.ExcelWriter', df: 'pd.DataFrame', sheet_name: str):
+        """写入工作表，列宽在写入前根据DataFrame计算，无需回读单元格"""
+        widths = self._column_widths(df)
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+        worksheet = writer.sheets[sheet_name]
+        for i, width in enumerate(widths):
+            worksheet.set_column(i, i, width)
+    
+    def _column_widths(self, df: 'pd.DataFrame') -> List[int]:
+        """根据表头和单元格内容计算每列宽度（限制最大宽度），按列向量化计算"""
+        widths = []
+        for i, col in enumerate(df.columns):
+            max_length = int(df.iloc[:, i].astype(str).str.len().max()) if len(df) else 0
+            max_length = max(max_length, len(str(col)))
+            widths.append(min(max_length, _MAX_COLUMN_WIDTH - 2) + 2)
+        return widths
     
-    def save_to_csv(self, data: Dict, api_name: str, keyword: str = "") -> str:
+    def save_to_csv(self, data: Dict, api_name: str, keyword: str = "") -> Future:
         """
         将API响应数据保存为CSV文件（备用方案）
         
@@ -108,98 +167,89 @@ class DataProcessor:
             keyword: 搜索关键词
             
         Returns:
-            保存的文件路径
+            写入任务的Future，结果为保存的文件路径，失败时为None
         """
-        # 创建日期目录
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        date_dir = os.path.join(Config.OUTPUT_DIR, date_str)
-        if not os.path.exists(date_dir):
-            os.makedirs(date_dir)
-        
-        timestamp = datetime.now().strftime("%H%M%S")
-        keyword_suffix = f"_{keyword}" if keyword else ""
-        filename = f"{api_name}{keyword_suffix}_{timestamp}.csv"
-        filepath = os.path.join(date_dir, filename)
-        
-        # 提取并扁平化数据
-        flattened_data = self._flatten_json(data)
-        
-        if not flattened_data:
-            flattened_data = [{'raw_response': json.dumps(data, ensure_ascii=False)}]
-        
-        # 写入CSV文件
-        fieldnames = list(flattened_data[0].keys())
-        
-        with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(flattened_data)
-        
-        return filepath
+        filepath, df, _, _ = self._prepare(data, api_name, keyword, '.csv')
+        return self._writer_pool.submit(self._write_csv, filepath, df)
+    
+    def _write_csv(self, filepath: str, df: 'pd.DataFrame') -> Optional[str]:
+        """在后台线程中写入CSV文件，返回写入的路径或None"""
+        try:
+            df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            self.logger.debug(f"CSV文件写入完成: {filepath}")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"CSV保存失败 {filepath}: {str(e)}")
+            return None
     
-    def _flatten_json(self, data: Any, prefix: str = '') -> List[Dict]:
+    def _to_dataframe(self, data: Any) -> 'pd.DataFrame':
         """
-        递归扁平化JSON数据
+        将JSON数据扁平化为DataFrame
+        
+        字典中最长的非空列表作为主要数据源逐行展开，其余标量字段作为每行的公共列，
+        嵌套字典按"父键_子键"展开，单元格中的列表转为JSON字符串
         
         Args:
             data: 要扁平化的数据
-            prefix: 字段前缀
             
         Returns:
-            扁平化后的数据列表
+            扁平化后的DataFrame
         """
+        import pandas as pd
+        
         if isinstance(data, dict):
-            result = []
-            # 如果字典包含列表类型的值，可能需要特殊处理
-            if any(isinstance(v, list) and v for v in data.values()):
-                # 找到最长的列表作为主要数据源
-                list_fields = {k: v for k, v in data.items() if isinstance(v, list) and v}
-                if list_fields:
-                    max_length = max(len(v) for v in list_fields.values())
-                    for i in range(max_length):
-                        row = {}
-                        for key, value in data.items():
-                            if isinstance(value, list) and value:
-                                if i < len(value):
-                                    if isinstance(value[i], dict):
-                                        # 递归处理嵌套字典
-                                        nested = self._flatten_dict(value[i], f"{prefix}{key}_")
-                                        row.update(nested)
-                                    else:
-                                        row[f"{prefix}{key}"] = value[i]
-                                else:
-                                    row[f"{prefix}{key}"] = ""
-                            elif not isinstance(value, list):
-                                if isinstance(value, dict):
-                                    nested = self._flatten_dict(value, f"{prefix}{key}_")
-                                    row.update(nested)
-                                else:
-                                    row[f"{prefix}{key}"] = value
-                        result.append(row)
-                    return result
+            list_fields = {k: v for k, v in data.items() if isinstance(v, list) and v}
+            if not list_fields:
+                # 普通字典处理
+                return self._stringify_lists(pd.json_normalize([data], sep='_'))
+            
+            # 找到最长的列表作为主要数据源
+            key = max(list_fields, key=lambda k: len(list_fields[k]))
+            records = list_fields[key]
+            scalar_meta = [k for k, v in data.items() if not isinstance(v, (list, dict))]
+            if all(isinstance(r, dict) for r in records):
+                df = pd.json_normalize(
+                    data, record_path=[key], meta=scalar_meta,
+                    record_prefix=f"{key}_", sep='_'
+                )
+            else:
+                df = pd.DataFrame({key: records})
+                for k in scalar_meta:
+                    df[k] = data[k]
             
-            # 普通字典处理
-            return [self._flatten_dict(data, prefix)]
+            # 嵌套字典和其余列表作为每行相同的列
+            extra = {k: v for k, v in data.items() if k != key and isinstance(v, (list, dict))}
+            if extra:
+                extra_row = pd.json_normalize([extra], sep='_').iloc[0]
+                for col, value in extra_row.items():
+                    df[col] = [value] * len(df)
+            return self._stringify_lists(df)
         
         elif isinstance(data, list) and data:
-            result = []
-            for item in data:
-                result.extend(self._flatten_json(item, prefix))
-            return result
+            if all(isinstance(item, dict) for item in data):
+                return self._stringify_lists(pd.json_normalize(data, sep='_'))
+            return self._stringify_lists(pd.DataFrame({'value': data}))
+        
+        elif isinstance(data, list):
+            return pd.DataFrame()
         
         else:
-            return [{f"{prefix}value": data}]
+            return pd.DataFrame({'value': [data]})
     
-    def _flatten_dict(self, data: Dict, prefix: str = '') -> Dict:
-        """扁平化单个字典"""
-        result = {}
-        for key, value in data.items():
-            new_key = f"{prefix}{key}"
-            if isinstance(value, dict):
-                result.update(self._flatten_dict(value, f"{new_key}_"))
-            elif isinstance(value, list):
-                # 简单处理列表，转为字符串
-                result[new_key] = json.dumps(value, ensure_ascii=False) if value else ""
-            else:
-                result[new_key] = value
-        return result
+    def _stringify_lists(self, df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """将单元格中的列表转为JSON字符串，空列表转为空字符串"""
+        for col in df.columns[df.dtypes == object]:
+            if df[col].map(lambda v: isinstance(v, list)).any():
+                df[col] = df[col].map(
+                    lambda v: (self._dumps(v) if v else "") if isinstance(v, list) else v)
+        return df
+    
+    def _dumps(self, value: Any) -> str:
+        """序列化为JSON字符串（保留非ASCII字符）"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(value).decode('utf-8')
+        return json.dumps(value, ensure_ascii=False)
+    
+    def close(self):
+        """等待后台写入全部完成并释放线程池"""
+        self._writer_pool.shutdown(wait=True)
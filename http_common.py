@@ -0,0 +1,43 @@
+import json
+from typing import Dict, Any
+from config import Config
+from circuit import CircuitBreaker
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，原有异常处理无需改动
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# 退避等待上限（秒）
+BACKOFF_CAP = 30
+
+# 视为JSON响应的content-type前缀
+JSON_HINTS = ('application/json', 'text/json')
+
+
+class ApiClientMixin:
+    """各API客户端共用的熔断器与请求参数构建逻辑，使用方需初始化 self._breakers"""
+
+    _breakers: Dict[str, CircuitBreaker]
+
+    def _get_breaker(self, api_name: str) -> CircuitBreaker:
+        """获取指定API的熔断器（按需创建）"""
+        breaker = self._breakers.get(api_name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                fail_threshold=Config.CIRCUIT_BREAKER_CONFIG['fail_threshold'],
+                recovery_seconds=Config.CIRCUIT_BREAKER_CONFIG['recovery_seconds']
+            )
+            self._breakers[api_name] = breaker
+        return breaker
+
+    def _build_params(self, api_config: Dict, dynamic_params: Dict[str, Any]) -> Dict:
+        """构建请求参数"""
+        missing = api_config['_required_params'] - dynamic_params.keys()
+        if missing:
+            raise ValueError(f"缺少必需的动态参数: {missing}")
+        return api_config['_build'](dynamic_params)
@@ -1,10 +1,20 @@
+import argparse
+import asyncio
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 from datetime import datetime
-from crawler import TikTokCrawler
+from typing import List, Optional
+
+# 文件日志的后台写入线程，由setup_logging创建
+_log_listener = None
 
 def setup_logging():
     """设置优化的日志配置"""
+    global _log_listener
+    
     # 创建日志目录 - 移到最前面
     log_dir = 'logs'
     if not os.path.exists(log_dir):
@@ -62,17 +72,35 @@ def setup_logging():
     error_handler.setFormatter(file_formatter)
     error_handler.setLevel(logging.ERROR)
     
+    # 文件写入交给后台线程，记录日志的线程只需入队
+    log_queue = queue.Queue(-1)
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, error_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+    
     # 配置根日志器
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
+    # 队列处理器放在控制台处理器之前：入队的是记录副本，不会带上彩色格式器改写的字段
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
     root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(error_handler)
     
     # 设置第三方库日志级别
     logging.getLogger('selenium').setLevel(logging.WARNING)
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('requests').setLevel(logging.WARNING)
+    # HTTP/2传输层（httpx）在DEBUG级别会逐帧记录日志
+    for name in ('httpx', 'httpcore', 'hpack', 'h2'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+def shutdown_logging():
+    """停止后台日志线程，写出队列中剩余的日志"""
+    global _log_listener
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 def print_banner():
     """打印程序启动横幅"""
@@ -92,65 +120,128 @@ def print_banner():
 """
     print(banner)
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='TikTok 数据爬虫工具')
+    parser.add_argument('--keywords', help='逗号分隔的关键词列表，如 a,b,c')
+    parser.add_argument('--keywords-file', help='关键词文件，每行一个关键词')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='同时处理的关键词数量，默认取HTTP_CONFIG中的max_concurrent_requests')
+    return parser.parse_args(argv)
+
+def load_keywords(args: argparse.Namespace) -> List[str]:
+    """
+    汇总命令行、关键词文件以及（非交互时）标准输入中的关键词
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        去除空白后的关键词列表
+    """
+    keywords = []
+    if args.keywords:
+        keywords.extend(args.keywords.split(','))
+    if args.keywords_file:
+        with open(args.keywords_file, encoding='utf-8') as f:
+            keywords.extend(f)
+    if not keywords and not sys.stdin.isatty():
+        # 通过管道传入关键词，每行一个
+        keywords.extend(sys.stdin)
+    return [k.strip() for k in keywords if k.strip()]
+
+def run_batch(crawler, keywords: List[str], concurrency: Optional[int], logger: logging.Logger):
+    """批量爬取关键词（非交互模式）"""
+    from crawler import AIOHTTP_AVAILABLE
+    
+    logger.info(f"🎯 批量处理 {len(keywords)} 个关键词")
+    if AIOHTTP_AVAILABLE:
+        files = asyncio.run(crawler.crawl_multiple_keywords_async(keywords, concurrency=concurrency))
+    else:
+        files = crawler.crawl_multiple_keywords(keywords)
+    
+    for path in files:
+        print(f"✅ 文件已保存: {path}")
+    print(f"\n📊 完成 {len(files)}/{len(keywords)} 个关键词")
+    logger.info(f"✅ 批量任务完成 - 成功 {len(files)}/{len(keywords)}")
+
+def run_interactive(crawler, logger: logging.Logger):
+    """交互模式：逐个输入关键词爬取"""
+    # 示例：单个关键词爬取
+    print("\n" + "="*60)
+    keyword = input("🔍 请输入搜索关键词: ").strip()
+    
+    if not keyword:
+        print("❌ 关键词不能为空！")
+        return
+        
+    print("="*60)
+    logger.info(f"🎯 开始处理关键词: {keyword}")
+    
+    excel_path = crawler.crawl_search_preview(keyword)
+    
+    if excel_path:
+        print("\n" + "🎉" + "="*58 + "🎉")
+        print(f"✅ 爬取成功！")
+        print(f"📄 文件路径: {excel_path}")
+        print(f"📁 存储目录: output/{datetime.now().strftime('%Y-%m-%d')}/")
+        print(f"🕐 完成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("🎉" + "="*58 + "🎉\n")
+        logger.info(f"✅ 任务完成 - 文件已保存: {excel_path}")
+    else:
+        print("\n❌ 爬取失败，请检查网络连接和参数配置")
+        logger.error("❌ 爬取任务失败")
+    
+    # 询问是否继续
+    while True:
+        continue_choice = input("\n🔄 是否继续爬取其他关键词？(y/n): ").strip().lower()
+        if continue_choice in ['n', 'no', '否']:
+            break
+        elif continue_choice in ['y', 'yes', '是']:
+            keyword = input("🔍 请输入新的搜索关键词: ").strip()
+            if keyword:
+                logger.info(f"🎯 开始处理关键词: {keyword}")
+                excel_path = crawler.crawl_search_preview(keyword)
+                if excel_path:
+                    print(f"✅ 爬取成功！文件已保存: {excel_path}")
+                    logger.info(f"✅ 任务完成 - 文件已保存: {excel_path}")
+                else:
+                    print("❌ 爬取失败")
+                    logger.error("❌ 爬取任务失败")
+            else:
+                print("❌ 关键词不能为空！")
+        else:
+            print("请输入 y 或 n")
+
 def main():
     """主函数"""
+    args = parse_args()
     print_banner()
     
     try:
         setup_logging()
         logger = logging.getLogger(__name__)
         
+        # 日志配置完成后再导入爬虫模块，导入阶段的错误也能写入日志
+        from crawler import TikTokCrawler
+        
+        keywords = load_keywords(args)
+        if not keywords and not sys.stdin.isatty():
+            print("❌ 未提供关键词！请使用 --keywords、--keywords-file 或通过标准输入传入")
+            logger.error("❌ 非交互模式下未提供关键词")
+            shutdown_logging()
+            return
+        
         logger.info("🚀 TikTok爬虫启动中...")
         
         # 创建爬虫实例
         crawler = TikTokCrawler()
         
         try:
-            # 示例：单个关键词爬取
-            print("\n" + "="*60)
-            keyword = input("🔍 请输入搜索关键词: ").strip()
-            
-            if not keyword:
-                print("❌ 关键词不能为空！")
-                return
-                
-            print("="*60)
-            logger.info(f"🎯 开始处理关键词: {keyword}")
-            
-            excel_path = crawler.crawl_search_preview(keyword)
-            
-            if excel_path:
-                print("\n" + "🎉" + "="*58 + "🎉")
-                print(f"✅ 爬取成功！")
-                print(f"📄 文件路径: {excel_path}")
-                print(f"📁 存储目录: output/{datetime.now().strftime('%Y-%m-%d')}/")
-                print(f"🕐 完成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                print("🎉" + "="*58 + "🎉\n")
-                logger.info(f"✅ 任务完成 - 文件已保存: {excel_path}")
+            if keywords:
+                run_batch(crawler, keywords, args.concurrency, logger)
             else:
-                print("\n❌ 爬取失败，请检查网络连接和参数配置")
-                logger.error("❌ 爬取任务失败")
-            
-            # 询问是否继续
-            while True:
-                continue_choice = input("\n🔄 是否继续爬取其他关键词？(y/n): ").strip().lower()
-                if continue_choice in ['n', 'no', '否']:
-                    break
-                elif continue_choice in ['y', 'yes', '是']:
-                    keyword = input("🔍 请输入新的搜索关键词: ").strip()
-                    if keyword:
-                        logger.info(f"🎯 开始处理关键词: {keyword}")
-                        excel_path = crawler.crawl_search_preview(keyword)
-                        if excel_path:
-                            print(f"✅ 爬取成功！文件已保存: {excel_path}")
-                            logger.info(f"✅ 任务完成 - 文件已保存: {excel_path}")
-                        else:
-                            print("❌ 爬取失败")
-                            logger.error("❌ 爬取任务失败")
-                    else:
-                        print("❌ 关键词不能为空！")
-                else:
-                    print("请输入 y 或 n")
+                run_interactive(crawler, logger)
             
         except KeyboardInterrupt:
             print("\n\n⚠️  用户中断程序")
@@ -163,11 +254,14 @@ def main():
             crawler.close()
             print("\n👋 程序已退出，感谢使用！")
             logger.info("👋 程序正常退出")
+            shutdown_logging()
             
     except Exception as e:
         print(f"\n💥 程序初始化失败: {str(e)}")
         print("请检查程序配置和依赖是否正确安装")
-        input("按任意键退出...")
+        shutdown_logging()
+        if sys.stdin.isatty():
+            input("按任意键退出...")
 
 if __name__ == "__main__":
     main()